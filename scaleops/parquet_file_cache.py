@@ -9,6 +9,9 @@ from functools import wraps
 import jsonpickle as jsonpickle
 import pandas as pd
 
+from scaleops.promql_pandas import flatten_column_levels, \
+    restore_column_levels
+
 
 class ParquetCacheType(Enum):
     SERIES = 'series'
@@ -72,20 +75,25 @@ class ParquetFileCache(ContextDecorator):
             if isinstance(result, pd.Series):
                 df = pd.DataFrame(result)
                 df.columns = df.columns.astype(str)
-                df.to_parquet(
-                        cache_file,
-                        use_deprecated_int96_timestamps=True
-                )
             else:
-                result.to_parquet(
-                        cache_file,
-                        use_deprecated_int96_timestamps=True
-                )
+                # MultiIndex columns (categorical levels, NaN for labels a
+                # series lacks) do not survive the pyarrow metadata round
+                # trip; serialize them as JSON-encoded flat names instead
+                df = flatten_column_levels(result)
+
+            df.to_parquet(
+                    cache_file,
+                    engine='pyarrow',
+                    compression='zstd',
+                    compression_level=3
+            )
 
     def get(self, key):
         cache_file = self.cache_path / f'{key}-{self.cache_type.value}.parquet'
         if cache_file.exists():
-            result = pd.read_parquet(cache_file, engine='fastparquet')
+            result = restore_column_levels(
+                    pd.read_parquet(cache_file, engine='pyarrow',
+                                    memory_map=True))
             if self.cache_type == ParquetCacheType.SERIES:
                 result = result.iloc[:, 0]
             print(f'Found {len(result.index)} cached records')
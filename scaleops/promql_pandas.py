@@ -1,33 +1,77 @@
 import datetime
+import functools
+import hashlib
+import json
 import logging
+import os
 import pathlib
 import re
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urljoin
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import requests
+from pyarrow import feather
 from dateutil import parser as dtparser
+from requests.adapters import HTTPAdapter, Retry
+
+try:
+    # orjson parses the multi-MB numeric payloads Prometheus returns several
+    # times faster than the stdlib decoder, but it is an optional extra.
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+try:
+    # ijson parses the response incrementally while it is still streaming in,
+    # overlapping decode with the network transfer; also an optional extra.
+    import ijson as _ijson
+except ImportError:
+    _ijson = None
 
 Timestamp = Union[
     str, float, datetime.datetime]  # RFC-3339 string or as a Unix timestamp in seconds
 Duration = Union[
     str, float, int, datetime.timedelta]  # Prometheus duration string
 
+_DURATION_CODES = {
+    'ms': 0.001,
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+    'w': 7 * 24 * 60 * 60,
+    'y': 365 * 24 * 60 * 60,
+}
+
+# a single time component, and the full duration string, precompiled once
+# since `duration_to_s` runs on every query for `step`/`timeout`
+_DURATION_RE = re.compile(r'(\d+)(ms|s|m|h|d|w|y)')
+_DURATION_FULL = re.compile(r'(?:(?:\d+)(?:ms|s|m|h|d|w|y))+')
+
 
 class Prometheus:
 
     def __init__(self,
                  api_url: str,
                  headers: Optional[Dict] = None,
-                 cache_path: Optional[pathlib.Path] = None):
+                 cache_path: Optional[pathlib.Path] = None,
+                 mem_cache_size: int = 16):
         """
         Create a Prometheus Client.
 
         :param api_url: The URL to the Prometheus API endpoint.
         :param headers: Required _headers for HTTP requests, default None.
         :param cache_path: Path to cache directory, default None.
+        :param mem_cache_size: Number of range-query results to keep in the
+                               in-process LRU cache, default 16. Set to 0 to
+                               disable.
         """
 
         # Get a _logger object
@@ -38,9 +82,50 @@ class Prometheus:
         self._headers = headers
         self._cache_path = cache_path
 
+        # One directory scan up front replaces a stat() per query; the write
+        # and flush paths keep this set in step with the directory
+        if cache_path is not None:
+            self._cache_index = {p.stem for p in cache_path.glob('*.feather')}
+        else:
+            self._cache_index = set()
+
+        # A small in-process LRU in front of the on-disk cache, so the same
+        # query issued twice in a notebook session never touches the
+        # filesystem on the second call. The lock keeps the lookup/evict
+        # sequences atomic when query_range_many fans out over threads.
+        self._mem_cache: 'OrderedDict[str, pd.DataFrame]' = OrderedDict()
+        self._mem_cache_size = mem_cache_size
+        self._mem_cache_lock = threading.Lock()
+
+        # Reuse one session for all queries so the underlying urllib3 pool
+        # keeps TCP+TLS connections alive across requests, and retry the
+        # transient gateway errors a busy Prometheus can return.
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=32,
+                max_retries=Retry(
+                        total=3,
+                        backoff_factor=0.2,
+                        status_forcelist=(502, 504)))
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+        self._http.headers.update({
+            'Connection': 'keep-alive',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip'
+        })
+
     def __enter__(self):
         return self
 
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self):
+        self._http.close()
+
     def label_values(self,
                      label: str,
                      metric: Optional[str] = None,
@@ -127,7 +212,8 @@ class Prometheus:
                     labels: Optional[Dict] = {},
                     timeout: Optional[Duration] = None,
                     sort: Optional[
-                        Callable[[Dict], Any]] = None) -> pd.DataFrame:
+                        Callable[[Dict], Any]] = None,
+                    flush_cache: Optional[bool] = False) -> pd.DataFrame:
         """
         Evaluates an expression query over a range of time.
         
@@ -143,6 +229,9 @@ class Prometheus:
         :param flush_cache: Flush the query cache before calling.
         :return: Pandas DataFrame.
         """
+        # Copy so the query_* entries added below never leak into the
+        # caller's dict (or the shared default) and poison the cache key
+        labels = dict(labels) if labels else {}
         epoch_start = to_ts(start)
         epoch_end = to_ts(end)
         step_seconds = duration_to_s(step)
@@ -153,8 +242,55 @@ class Prometheus:
             'step': step_seconds
         }
 
-        if timeout is not None:
-            params['timeout'] = duration_to_s(timeout)
+        timeout_s = duration_to_s(timeout) if timeout is not None else None
+        if timeout_s is not None:
+            params['timeout'] = timeout_s
+
+        # timeout is part of the key because it becomes a query_timeout
+        # column level below - a hit must have the same shape as a fetch
+        query_hash = _query_hash(_range_cache_key(
+                query, epoch_start, epoch_end, step_seconds, labels,
+                timeout_s))
+
+        if flush_cache:
+            with self._mem_cache_lock:
+                self._mem_cache.pop(query_hash, None)
+        else:
+            with self._mem_cache_lock:
+                cached = self._mem_cache.get(query_hash)
+                if cached is not None:
+                    self._mem_cache.move_to_end(query_hash)
+            if cached is not None:
+                # Shallow copy so downstream mutation doesn't poison the cache
+                return cached.copy(deep=False)
+
+        cache_file = None
+        if self._cache_path is not None:
+            cache_file = self._cache_path / f'{query_hash}.feather'
+            if flush_cache:
+                self._cache_index.discard(query_hash)
+                try:
+                    os.remove(cache_file)
+                except FileNotFoundError:
+                    pass
+            elif query_hash in self._cache_index:
+                # The index check costs a set lookup instead of a stat(); the
+                # except still covers files removed behind our back,
+                # ArrowInvalid covers files truncated by a killed writer, and
+                # ValueError/TypeError cover entries written by an older
+                # cache format — all fall through to a refetch that rewrites
+                # the entry
+                try:
+                    metric_result = restore_column_levels(
+                            feather.read_feather(cache_file))
+                except (FileNotFoundError, pa.ArrowInvalid,
+                        ValueError, TypeError):
+                    self._cache_index.discard(query_hash)
+                else:
+                    self._mem_cache_put(query_hash, metric_result)
+                    self._logger.info(
+                            f'Read {len(metric_result.index)} cached records for (query={query}, start={start}, end={end})')
+                    return metric_result
 
         for k in params.keys():
             labels[f'query_{k}'] = f'{params[k]}'
@@ -169,20 +305,116 @@ class Prometheus:
                 sort,
                 labels)
 
+        if cache_file is not None:
+            self._cache_path.mkdir(parents=True, exist_ok=True)
+            # Arrow IPC (Feather v2) opens and decodes much faster than
+            # parquet for whole-file reads, which is all this cache does.
+            # Going through Table.from_pandas keeps the MultiIndex columns
+            # and timestamp index in the pandas metadata for the read side.
+            # Write to a temp file and rename so a killed process can never
+            # leave a truncated cache entry at the final path. The temp name
+            # is unique per write: concurrent threads fetching the same query
+            # (both missing the mem cache) must not rename each other's
+            # half-written files.
+            fd, tmp_name = tempfile.mkstemp(dir=self._cache_path,
+                                            suffix='.tmp')
+            os.close(fd)
+            feather.write_feather(
+                    pa.Table.from_pandas(flatten_column_levels(metric_result)),
+                    tmp_name,
+                    compression='lz4')
+            os.replace(tmp_name, cache_file)
+            self._cache_index.add(query_hash)
+        self._mem_cache_put(query_hash, metric_result)
+
         self._logger.info(
             f'Received {len(metric_result.index)} records for (query={query}, start={start}, end={end})')
         return metric_result
 
-    def _do_query(self, path: str, params: Dict) -> Dict:
-        with requests.Session() as http:
-            resp = http.get(urljoin(self._api_url, path),
-                            headers=self._headers,
-                            params=params)
+    def query_range_many(self,
+                         specs: List[Dict],
+                         max_workers: int = 16) -> List[pd.DataFrame]:
+        """
+        Evaluates several range queries concurrently.
+
+        Each spec is a dictionary of `query_range` keyword arguments. The
+        queries fan out over the pooled session, so N round trips overlap
+        instead of running back to back.
 
-        if resp.status_code not in [400, 422, 503]:
-            resp.raise_for_status()
+        :param specs: A list of dictionaries of `query_range` keyword arguments.
+        :param max_workers: Maximum number of concurrent queries, default 16.
+        :return: A list of Pandas DataFrames, in the same order as `specs`.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                    lambda spec: self.query_range(**spec), specs))
+
+    def flush_query_cache(self,
+                          query: str,
+                          start: Timestamp,
+                          end: Timestamp,
+                          step: Duration,
+                          labels: Optional[Dict] = {},
+                          timeout: Optional[Duration] = None) -> None:
+        """
+        Remove the cached result for a range query, if one exists.
 
-        response = resp.json()
+        :param query: Prometheus expression query string.
+        :param start: Start timestamp.
+        :param end: End timestamp.
+        :param step: Query resolution step width in `duration` format or float number of seconds.
+        :param labels: A dictionary of labels to add to each set of metric labels
+        :param timeout: Evaluation timeout the query was issued with. Optional.
+        """
+        timeout_s = duration_to_s(timeout) if timeout is not None else None
+        query_hash = _query_hash(_range_cache_key(
+                query, to_ts(start), to_ts(end), duration_to_s(step), labels,
+                timeout_s))
+        with self._mem_cache_lock:
+            self._mem_cache.pop(query_hash, None)
+
+        if self._cache_path is None:
+            return
+
+        self._cache_index.discard(query_hash)
+        try:
+            os.remove(self._cache_path / f'{query_hash}.feather')
+        except FileNotFoundError:
+            pass
+
+    def _mem_cache_put(self, query_hash: str,
+                       metric_result: pd.DataFrame) -> None:
+        if self._mem_cache_size <= 0:
+            return
+        # Insert a shallow copy so the object handed back to the caller on
+        # the miss and disk-hit paths is never the cached one - the hit path
+        # copies on the way out for the same reason
+        with self._mem_cache_lock:
+            self._mem_cache[query_hash] = metric_result.copy(deep=False)
+            self._mem_cache.move_to_end(query_hash)
+            while len(self._mem_cache) > self._mem_cache_size:
+                self._mem_cache.popitem(last=False)
+
+    def _do_query(self, path: str, params: Dict) -> Dict:
+        resp = self._http.get(urljoin(self._api_url, path),
+                              headers=self._headers,
+                              params=params,
+                              stream=_ijson is not None)
+        try:
+            if resp.status_code not in [400, 422, 503]:
+                resp.raise_for_status()
+
+            if _ijson is not None:
+                # Feed the raw urllib3 stream straight into the incremental
+                # parser; the top-level key/value pairs rebuild the same dict
+                # resp.json() would have produced, but the decode happens
+                # while the body is still arriving
+                resp.raw.decode_content = True
+                response = dict(_ijson.kvitems(resp.raw, ''))
+            else:
+                response = _json.loads(resp.content)
+        finally:
+            resp.close()
         if response['status'] != 'success':
             raise RuntimeError(f'{params} error. {response["errorType"]}: {response["error"]}')
 
@@ -224,25 +456,20 @@ class Prometheus:
     def _vector_to_numpy(cls, results: dict) -> Tuple[np.ndarray, List]:
         """Take a list of results and turn it into a numpy array."""
 
-        # Create the destination array and NaN fill for missing data
-        data = np.zeros((len(results)), dtype=np.float64)
-        data[:] = np.nan
-
-        metrics = []
-
-        for ii, t in enumerate(results):
-            metric = t['metric']
-            value = t['value'][1]
-
-            # Insert the data while converting all the string values data into floating
-            # point, simply using `float` works fine as it supports all the string
-            # prometheus uses for special values
-            data[ii] = np.float64(value)
-
-            metrics.append(metric)
+        # Bulk-convert the value column in C rather than assigning one boxed
+        # float per result; the float64 dtype parses all the strings
+        # prometheus uses for special values. Every slot is written, so no
+        # NaN pre-fill is needed.
+        metrics = [t['metric'] for t in results]
+        data = np.fromiter((t['value'][1] for t in results),
+                           dtype=np.float64, count=len(results))
 
         return data, metrics
 
+    # Only fan out when there are enough series to amortize thread startup;
+    # narrow results stay on the serial path
+    _parallel_series_threshold = 256
+
     @classmethod
     def _matrix_to_numpy(cls, results: dict, start: float, end: float,
                          step: float) -> Tuple[
@@ -253,29 +480,49 @@ class Prometheus:
         # to the end to make it inclusive if it lies exactly on an interval boundary
         times = np.arange(start, end + 1e-6, step)
 
-        # Create the destination array and NaN fill for missing data
-        data = np.zeros((len(results), len(times)), dtype=np.float64)
-        data[:] = np.nan
-
-        metrics = []
-
-        for ii, t in enumerate(results):
-            metric = t['metric']
-            metric_times, values = zip(*t['values'])
+        # Create the destination array NaN-filled for missing data. It is laid
+        # out (time, series) so the DataFrame can take it without the copy a
+        # transposed view would force.
+        data = np.full((len(times), len(results)), np.nan, dtype=np.float64)
+
+        metrics = [t['metric'] for t in results]
+
+        # Prometheus timestamps carry millisecond resolution, so align to the
+        # grid in integer milliseconds: exact arithmetic, no float divide
+        start_ms = int(round(start * 1000))
+        step_ms = int(round(step * 1000))
+
+        def insert_series(ii: int, t: Dict) -> None:
+            # Bulk-convert timestamps and values in C rather than boxing each
+            # element through the interpreter. Viewing the sample pairs as a
+            # single (n, 2) object array avoids materializing intermediate
+            # tuples, and the column-wise float64 casts parse the value
+            # strings directly, including the strings prometheus uses for
+            # special values.
+            pairs = np.asarray(t['values'], dtype=object)
+            metric_times = pairs[:, 0].astype(np.float64, copy=False)
+            vals = pairs[:, 1].astype(np.float64, copy=False)
 
             # This identifies which slots to insert the data into. Note that it relies
             # on the fact that Prometheus produces the same grid of samples as we do in
-            # here. That should be fine, and we use `np.rint` to mitigate any possible
-            # rounding issues, but it's worth noting.
-            inds = np.rint((np.array(metric_times) - start) / step).astype(
-                    np.int64)
-
-            # Insert the data while converting all the string values data into floating
-            # point, simply using `float` works fine as it supports all the string
-            # prometheus uses for special values
-            data[ii, inds] = [np.float64(v) for v in values]
-
-            metrics.append(metric)
+            # here. That should be fine: rounding to integer milliseconds
+            # (the half-millisecond nudge guards the float multiply) makes
+            # the floor division exact.
+            mt_ms = (metric_times * 1000 + 0.5).astype(np.int64)
+            inds = (mt_ms - start_ms) // step_ms
+
+            data[inds, ii] = vals
+
+        if len(results) >= cls._parallel_series_threshold:
+            # NumPy releases the GIL during the float64 casts, and each series
+            # writes a disjoint column of `data`, so threads scale here. The
+            # list() drains the iterator so worker exceptions propagate.
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                list(executor.map(lambda it: insert_series(*it),
+                                  enumerate(results)))
+        else:
+            for ii, t in enumerate(results):
+                insert_series(ii, t)
 
         return data, metrics, times
 
@@ -285,36 +532,153 @@ class Prometheus:
         index = cls._metric_index(metrics, labels)
         return pd.Series(data, index=index)
 
+    # Repeated range queries over the same (start, end, step) grid produce
+    # byte-identical DatetimeIndex objects; since they are immutable they can
+    # be shared across results instead of re-parsed per query. The lock keeps
+    # concurrent evictions from racing each other.
+    _index_cache: Dict[Tuple[float, float, int], pd.Index] = {}
+    _index_cache_size = 64
+    _index_cache_lock = threading.Lock()
+
     @classmethod
     def _numpy_to_dataframe(cls, data: np.ndarray, metrics: List,
                             times: np.ndarray,
                             labels: Dict = None) -> pd.DataFrame:
         columns = cls._metric_index(metrics, labels)
-        index = pd.Index(pd.to_datetime(times, unit='s'), name='timestamp')
-        return pd.DataFrame(data.T, columns=columns, index=index)
+        index = cls._timestamp_index(times)
+        return pd.DataFrame(data, columns=columns, index=index)
+
+    @classmethod
+    def _timestamp_index(cls, times: np.ndarray) -> pd.Index:
+        key = (times[0], times[-1], len(times))
+        with cls._index_cache_lock:
+            index = cls._index_cache.get(key)
+            if index is None:
+                index = pd.Index(pd.to_datetime(times, unit='s'),
+                                 name='timestamp')
+                if len(cls._index_cache) >= cls._index_cache_size:
+                    cls._index_cache.pop(next(iter(cls._index_cache)))
+                cls._index_cache[key] = index
+        return index
 
     @classmethod
     def _metric_index(cls, metrics: List, labels: Dict = None) -> pd.MultiIndex:
         # Merge labels if they exist
         metrics_labels = _merge_metric_labels(metrics, labels)
-        # Get the set of all the unique label names
-        levels = set()
+        # Fold the `__name__` -> `metric_name` rename into a single pass that
+        # also collects the unique label names
         for m in metrics_labels:
-            if '__name__' in m.keys():
+            if '__name__' in m:
                 m['metric_name'] = m.pop('__name__')
-            levels |= set(m.keys())
-        levels = sorted(list(levels))
+        levels = sorted({k for m in metrics_labels for k in m})
         if len(levels) == 0:
             raise RuntimeError(
                     'Queries that are constructed as pandas df need to have at least one label category in the results')
 
-        # Get the set of label values for each metric series and turn into a multilevel index
-        mt = [tuple(m.get(level, None) for level in levels) for m in
-              metrics_labels]
-        index = pd.MultiIndex.from_tuples(mt, names=levels)
+        # Build the index one level at a time; `from_arrays` categorizes each
+        # level independently instead of re-hashing per-metric tuples. The
+        # builder is specialized per label schema, which repeated dashboard
+        # queries share, so only the first query with a given schema pays for
+        # its construction.
+        # Categoricals collapse each level to integer codes plus its unique
+        # label strings, instead of one Python object per series
+        arrays = [pd.Categorical(values) for values in
+                  _compile_index_builder(tuple(levels))(metrics_labels)]
+        index = pd.MultiIndex.from_arrays(arrays, names=levels)
         return index
 
 
+@functools.lru_cache(maxsize=128)
+def _compile_index_builder(levels: Tuple[str, ...]) -> Callable[[List], List]:
+    """Generate a per-level value collector specialized to one label schema.
+
+    The generated function walks the metrics once, appending each level's
+    value through a pre-bound `list.append`, instead of running one
+    `m.get(level)` comprehension per level. Level names are bound as cell
+    variables rather than interpolated into the source, so arbitrary label
+    names are safe.
+    """
+    n = len(levels)
+    unpack = ', '.join(f'l{i}' for i in range(n))
+    lists = '; '.join(f'a{i} = []' for i in range(n))
+    appends = '; '.join(f'ap{i} = a{i}.append' for i in range(n))
+    body = '; '.join(f'ap{i}(g(l{i}))' for i in range(n))
+    src = (f'def _build(ms):\n'
+           f'    {unpack}{"," if n == 1 else ""} = _levels\n'
+           f'    {lists}\n'
+           f'    {appends}\n'
+           f'    for m in ms:\n'
+           f'        g = m.get\n'
+           f'        {body}\n'
+           f'    return [{", ".join(f"a{i}" for i in range(n))}]\n')
+    namespace = {'_levels': levels}
+    exec(src, namespace)
+    return namespace['_build']
+
+
+_FLAT_COLUMNS_PREFIX = 'scaleops.columns:'
+
+
+def flatten_column_levels(metric_result: pd.DataFrame) -> pd.DataFrame:
+    """Return a shallow copy whose MultiIndex columns are JSON-encoded names.
+
+    pyarrow stores MultiIndex column names by stringifying each tuple into
+    its pandas metadata and `ast.literal_eval`-ing it back, which breaks as
+    soon as a level holds NaN (a label one series has and another lacks).
+    Instead of relying on that metadata, encode each column as a JSON list
+    and keep the level names behind a sentinel prefix on the flat index
+    name; `restore_column_levels` rebuilds the original index on read. The
+    data and the row index are shared, not copied.
+    """
+    columns = metric_result.columns
+    if not isinstance(columns, pd.MultiIndex):
+        return metric_result
+
+    metric_result = metric_result.copy(deep=False)
+    flat = [json.dumps(
+            [None if (v is None or (isinstance(v, float) and np.isnan(v)))
+             else v for v in name],
+            default=str) for name in columns]
+    metric_result.columns = pd.Index(
+            flat,
+            name=_FLAT_COLUMNS_PREFIX + json.dumps(list(columns.names)))
+    return metric_result
+
+
+def restore_column_levels(metric_result: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild the MultiIndex columns `flatten_column_levels` encoded."""
+    name = metric_result.columns.name
+    if not (isinstance(name, str) and name.startswith(_FLAT_COLUMNS_PREFIX)):
+        return metric_result
+
+    metric_result = metric_result.copy(deep=False)
+    names = json.loads(name[len(_FLAT_COLUMNS_PREFIX):])
+    names = [None if n is None else n for n in names]
+    tuples = [tuple(json.loads(c)) for c in metric_result.columns]
+    if tuples:
+        metric_result.columns = pd.MultiIndex.from_tuples(tuples, names=names)
+    else:
+        metric_result.columns = pd.MultiIndex.from_arrays(
+                [[] for _ in names], names=names)
+    return metric_result
+
+
+@functools.lru_cache(maxsize=1024)
+def _query_hash(cache_key: str) -> str:
+    # Memoized so the repeated queries a dashboard issues only pay for the
+    # SHA-256 digest once; the hash is only used as a cache filename.
+    return hashlib.sha256(cache_key.encode('utf-8')).hexdigest()
+
+
+def _range_cache_key(query: str, epoch_start: int, epoch_end: int,
+                     step_seconds: float, labels: Dict,
+                     timeout_s: Optional[float] = None) -> str:
+    label_part = ','.join(
+            f'{k}={v}' for k, v in sorted(labels.items())) if labels else ''
+    return (f'{query}|{epoch_start}|{epoch_end}|{step_seconds}|{timeout_s}'
+            f'|{label_part}')
+
+
 def _merge_metric_labels(metrics: List, labels: Dict) -> List:
     if labels:
         return [{**m, **labels} for m in metrics]
@@ -336,16 +700,28 @@ def to_ts(ts: Timestamp) -> int:
     timestamp
         UNIX timestamp.
     """
-    if not isinstance(ts, (str, float, datetime.datetime)):
-        raise TypeError(f'dt must be a float or datetime. Got {type(ts)}')
+    # Fast-path the common float case with an exact type check; the
+    # isinstance dispatch below only runs for the other Timestamp variants
+    # (and float subclasses)
+    if type(ts) is float:
+        return int(round(ts))
+
+    if isinstance(ts, str):
+        return _parse_ts_str(ts)
+
+    if isinstance(ts, datetime.datetime):
+        return int(round(ts.timestamp()))
 
     if isinstance(ts, float):
         return int(round(ts))
 
-    if isinstance(ts, str):
-        return int(round(dtparser.parse(ts).timestamp()))
+    raise TypeError(f'dt must be a float or datetime. Got {type(ts)}')
+
 
-    return int(round(ts.timestamp()))
+@functools.lru_cache(maxsize=256)
+def _parse_ts_str(ts: str) -> int:
+    # Dashboard timestamps repeat heavily, so memoize the dateutil parse
+    return int(round(dtparser.parse(ts).timestamp()))
 
 
 def duration_to_s(duration: Duration) -> float:
@@ -362,39 +738,21 @@ def duration_to_s(duration: Duration) -> float:
     seconds
         The number of seconds corresponding to the duration.
     """
-    if not isinstance(duration, (str, float, int)):
-        raise TypeError(f'Cannot convert {duration}.')
-
+    # Fast-path the common numeric case before any pattern work
     if isinstance(duration, (float, int)):
         return float(duration)
 
     if isinstance(duration, datetime.timedelta):
         return duration.total_seconds()
 
-    duration_codes = {
-        'ms': 0.001,
-        's': 1,
-        'm': 60,
-        'h': 60 * 60,
-        'd': 24 * 60 * 60,
-        'w': 7 * 24 * 60 * 60,
-        'y': 365 * 24 * 60 * 60,
-    }
-
-    # a single time component
-    pattern = f'(\\d+)({"|".join(duration_codes.keys())})'
+    if not isinstance(duration, str):
+        raise TypeError(f'Cannot convert {duration}.')
 
-    if not re.fullmatch(f'({pattern})+', duration):
+    if not _DURATION_FULL.fullmatch(duration):
         raise ValueError(f'Invalid format of duration string {duration}.')
 
-    seconds = 0
-    for match in re.finditer(pattern, duration):
-        num = match.group(1)
-        code = match.group(2)
-
-        seconds += int(num) * duration_codes[code]
-
-    return seconds
+    return sum(int(num) * _DURATION_CODES[code]
+               for num, code in _DURATION_RE.findall(duration))
 
 
 def ts_to_ms(ts: Timestamp):
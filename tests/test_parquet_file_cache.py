@@ -0,0 +1,59 @@
+import pathlib
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from scaleops.parquet_file_cache import ParquetCacheType, ParquetFileCache
+from scaleops.promql_pandas import Prometheus
+
+
+class ParquetFileCacheTest(TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self._cache_path = pathlib.Path(self._tmp.name)
+
+    def test_dataframe_round_trip(self):
+        # Build the columns the way query_range does, so the categorical
+        # levels of _metric_index go through the parquet round trip
+        metrics = [{'__name__': 'up', 'job': 'a'},
+                   {'__name__': 'up', 'job': 'b'}]
+        columns = Prometheus._metric_index(metrics)
+        index = pd.Index(pd.to_datetime([0, 60], unit='s'), name='timestamp')
+        df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]],
+                          index=index, columns=columns)
+
+        cache = ParquetFileCache(self._cache_path)
+        cache.put('key', df)
+        result = cache.get('key')
+
+        self.assertEqual(list(df.columns), list(result.columns))
+        self.assertEqual(list(df.columns.names), list(result.columns.names))
+        self.assertTrue((df.values == result.values).all())
+
+    def test_dataframe_round_trip_heterogeneous_labels(self):
+        # one series carries a `pod` label the other lacks, so a column
+        # level holds NaN - the case that poisons pyarrow's column metadata
+        metrics = [{'__name__': 'up', 'job': 'a', 'pod': 'p1'},
+                   {'__name__': 'up', 'job': 'b'}]
+        columns = Prometheus._metric_index(metrics)
+        index = pd.Index(pd.to_datetime([0, 60], unit='s'), name='timestamp')
+        df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]],
+                          index=index, columns=columns)
+
+        cache = ParquetFileCache(self._cache_path)
+        cache.put('key', df)
+        result = cache.get('key')
+
+        self.assertTrue(df.columns.equals(result.columns))
+        self.assertEqual(list(df.columns.names), list(result.columns.names))
+        self.assertTrue((df.values == result.values).all())
+
+    def test_series_round_trip(self):
+        cache = ParquetFileCache(self._cache_path, ParquetCacheType.SERIES)
+        series = pd.Series(['a', 'b'], name='job')
+        cache.put('key', series)
+        result = cache.get('key')
+        self.assertIsInstance(result, pd.Series)
+        self.assertEqual(list(series.values), list(result.values))
@@ -0,0 +1,84 @@
+import pathlib
+import tempfile
+from unittest import TestCase, mock
+
+from scaleops.promql_pandas import Prometheus
+
+_MATRIX = {'resultType': 'matrix', 'result': [
+    {'metric': {'__name__': 'up', 'job': 'a'},
+     'values': [[0.0, '1'], [60.0, '2']]}]}
+
+
+class PrometheusQueryCacheTest(TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self._cache_path = pathlib.Path(self._tmp.name)
+
+    def _client(self) -> Prometheus:
+        # mem_cache_size=0 so every hit exercises the feather files
+        return Prometheus('http://localhost:9090/',
+                          cache_path=self._cache_path,
+                          mem_cache_size=0)
+
+    def test_round_trip(self):
+        p = self._client()
+        with mock.patch.object(p, '_do_query', return_value=_MATRIX) as dq:
+            first = p.query_range('up', 0.0, 60.0, '1m')
+            second = p.query_range('up', 0.0, 60.0, '1m')
+            self.assertEqual(1, dq.call_count)
+        self.assertEqual(list(first.columns), list(second.columns))
+        self.assertEqual(list(first.columns.names),
+                         list(second.columns.names))
+        self.assertTrue((first.values == second.values).all())
+
+    def test_round_trip_with_heterogeneous_labels(self):
+        # one series carries a `pod` label the other lacks, so a column
+        # level holds NaN - the case that poisons pyarrow's column metadata
+        results = {'resultType': 'matrix', 'result': [
+            {'metric': {'__name__': 'up', 'job': 'a', 'pod': 'p1'},
+             'values': [[0.0, '1'], [60.0, '2']]},
+            {'metric': {'__name__': 'up', 'job': 'b'},
+             'values': [[0.0, '3'], [60.0, '4']]}]}
+
+        p = self._client()
+        with mock.patch.object(p, '_do_query', return_value=results):
+            first = p.query_range('up', 0.0, 60.0, '1m')
+
+        p2 = self._client()
+        with mock.patch.object(p2, '_do_query', return_value=results) as dq:
+            second = p2.query_range('up', 0.0, 60.0, '1m')
+            self.assertEqual(0, dq.call_count)
+        self.assertTrue(first.columns.equals(second.columns))
+        self.assertEqual(list(first.columns.names),
+                         list(second.columns.names))
+        self.assertTrue((first.values == second.values).all())
+
+    def test_truncated_cache_file_is_refetched_and_repaired(self):
+        p = self._client()
+        with mock.patch.object(p, '_do_query', return_value=_MATRIX):
+            p.query_range('up', 0.0, 60.0, '1m')
+
+        # simulate a writer killed mid-flight
+        cache_file, = self._cache_path.glob('*.feather')
+        cache_file.write_bytes(cache_file.read_bytes()[:32])
+
+        p2 = self._client()
+        with mock.patch.object(p2, '_do_query', return_value=_MATRIX) as dq:
+            p2.query_range('up', 0.0, 60.0, '1m')
+            self.assertEqual(1, dq.call_count)
+
+        # the refetch rewrote a readable cache entry
+        p3 = self._client()
+        with mock.patch.object(p3, '_do_query', return_value=_MATRIX) as dq:
+            p3.query_range('up', 0.0, 60.0, '1m')
+            self.assertEqual(0, dq.call_count)
+
+    def test_flush_query_cache(self):
+        p = self._client()
+        with mock.patch.object(p, '_do_query', return_value=_MATRIX) as dq:
+            p.query_range('up', 0.0, 60.0, '1m')
+            p.flush_query_cache('up', 0.0, 60.0, '1m')
+            self.assertEqual([], list(self._cache_path.glob('*.feather')))
+            p.query_range('up', 0.0, 60.0, '1m')
+            self.assertEqual(2, dq.call_count)